@@ -5,11 +5,15 @@ Scrapes all blog posts and saves them as JSON files in wwwroot/content/blog/
 """
 
 import requests
-from bs4 import BeautifulSoup
-import json
+from requests.adapters import HTTPAdapter
+from bs4 import BeautifulSoup, SoupStrainer
+import orjson
 import os
 import re
+import shutil
+import threading
 from urllib.parse import urljoin, urlparse
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 import time
 from pathlib import Path
@@ -18,66 +22,173 @@ BASE_URL = "https://postgrespro.com/blog"
 CONTENT_DIR = Path(__file__).parent.parent / "Postgrespro.tr" / "wwwroot" / "content" / "blog"
 IMAGES_DIR = Path(__file__).parent.parent / "Postgrespro.tr" / "wwwroot" / "blog"
 
-# Category mappings
-CATEGORY_MAP = {
-    "PostgreSQL": {"en": "PostgreSQL", "tr": "PostgreSQL"},
-    "Company Updates": {"en": "Company Updates", "tr": "Şirket Güncellemeleri"}
+# Number of posts scraped concurrently
+MAX_WORKERS = 8
+
+# Minimum seconds between requests, shared by all workers (be polite)
+REQUEST_INTERVAL = 2.0
+
+# Extra attempts for requests failing with connection errors or timeouts
+MAX_RETRIES = 3
+
+# Category mappings (English name -> Turkish name)
+CATEGORY_TR = {
+    "PostgreSQL": "PostgreSQL",
+    "Company Updates": "Şirket Güncellemeleri"
 }
 
+# Shared HTTP session (connection pooling, keep-alive); retries are
+# done in fetch() so each attempt goes through the rate limiter
+SESSION = requests.Session()
+SESSION.headers.update({
+    'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
+})
+_adapter = HTTPAdapter(pool_connections=16, pool_maxsize=16)
+SESSION.mount('http://', _adapter)
+SESSION.mount('https://', _adapter)
+
+# Elements stripped from post content, joined into one selector so the
+# tree is walked once
+UNWANTED_SELECTORS = [
+    'script', 'style', 'nav', 'footer', 'header',
+    '.subscribe', '.social-share', '.newsletter',
+    '.advertisement', '.ads', '[class*="ad-"]',
+    '[class*="subscribe"]', '[class*="newsletter"]'
+]
+UNWANTED_CSS = ', '.join(UNWANTED_SELECTORS)
+
+# Human-readable date formats tried after ISO 8601
+DATE_FORMATS = ('%B %d, %Y', '%d %B %Y')
+
+# Downloaded images, keyed by absolute URL -> local path
+_IMG_CACHE = {}
+
+# Image directories already created during this run
+_ENSURED_DIRS = set()
+
+# Turkish character replacements for slugs
+_SLUG_TRANS = str.maketrans({
+    'ğ': 'g', 'ü': 'u', 'ş': 's', 'ı': 'i', 'ö': 'o', 'ç': 'c',
+    'Ğ': 'g', 'Ü': 'u', 'Ş': 's', 'İ': 'i', 'Ö': 'o', 'Ç': 'c'
+})
+
+# Global rate limiter state: monotonic time of the next free request slot
+_RATE_LOCK = threading.Lock()
+_next_request_at = 0.0
+
+# Precompiled regular expressions
+_RE_FN_CLEAN = re.compile(r'[^\w\s-]')
+_RE_FN_DASH = re.compile(r'[-\s]+')
+_RE_SLUG_ALPHA = re.compile(r'[^a-z0-9\s-]')
+_RE_SLUG_SPACE = re.compile(r'\s+')
+_RE_SLUG_DASH = re.compile(r'-+')
+_RE_WORDS = re.compile(r'\b\w+\b')
+_RE_DATE = re.compile(r'date|published')
+_RE_AUTHOR = re.compile(r'author|byline')
+_RE_CAT = re.compile(r'category|tag')
+_RE_TAG = re.compile(r'tag|keyword')
+_RE_CONTENT = re.compile(r'content|post-body')
+_RE_NEXT = re.compile(r'next|pagination')
+_RE_BLOG_HREF = re.compile(r'/blog/')
+
+# Post elements located by tag name and by class pattern
+POST_ELEMENT_NAMES = frozenset(['h1', 'title', 'time', 'article', 'main', 'body'])
+POST_CLASS_PATTERNS = (
+    ('date', _RE_DATE),
+    ('author', _RE_AUTHOR),
+    ('category', _RE_CAT),
+    ('content', _RE_CONTENT),
+)
+
+# Listing pages are parsed for anchors only
+ONLY_LINKS = SoupStrainer('a')
+
+def wait_for_request_slot():
+    """Block until the global rate limit allows another request"""
+    global _next_request_at
+    with _RATE_LOCK:
+        now = time.monotonic()
+        slot = max(now, _next_request_at)
+        _next_request_at = slot + REQUEST_INTERVAL
+    # Sleep outside the lock so other workers can reserve later slots
+    time.sleep(slot - now)
+
+def fetch(url, **kwargs):
+    """GET a URL through the shared session, respecting the rate limit"""
+    for attempt in range(MAX_RETRIES + 1):
+        # Every attempt, including retries, waits for its own slot
+        wait_for_request_slot()
+        try:
+            return SESSION.get(url, **kwargs)
+        except (requests.ConnectionError, requests.Timeout):
+            if attempt == MAX_RETRIES:
+                raise
+
+def declared_encoding(response):
+    """Return the charset declared in the Content-Type header, if any"""
+    # Without one, the parser falls back to <meta charset> instead of
+    # requests' slower charset detection
+    if 'charset' in response.headers.get('content-type', '').lower():
+        return response.encoding
+    return None
+
 def sanitize_filename(filename):
     """Sanitize filename for filesystem"""
-    filename = re.sub(r'[^\w\s-]', '', filename)
-    filename = re.sub(r'[-\s]+', '-', filename)
+    filename = _RE_FN_CLEAN.sub('', filename)
+    filename = _RE_FN_DASH.sub('-', filename)
     return filename.lower().strip('-')
 
 def generate_slug(title):
     """Generate URL-friendly slug from title"""
-    slug = title.lower()
     # Replace Turkish characters
-    slug = slug.replace('ğ', 'g').replace('ü', 'u').replace('ş', 's')
-    slug = slug.replace('ı', 'i').replace('ö', 'o').replace('ç', 'c')
+    slug = title.translate(_SLUG_TRANS).lower()
     # Remove special characters
-    slug = re.sub(r'[^a-z0-9\s-]', '', slug)
+    slug = _RE_SLUG_ALPHA.sub('', slug)
     # Replace spaces with hyphens
-    slug = re.sub(r'\s+', '-', slug)
+    slug = _RE_SLUG_SPACE.sub('-', slug)
     # Remove multiple hyphens
-    slug = re.sub(r'-+', '-', slug)
+    slug = _RE_SLUG_DASH.sub('-', slug)
     return slug.strip('-')
 
 def calculate_reading_time(text):
     """Calculate reading time in minutes (average 200 words per minute)"""
-    words = len(re.findall(r'\b\w+\b', text))
+    words = sum(1 for _ in _RE_WORDS.finditer(text))
     return max(1, (words + 199) // 200)
 
-def clean_html_content(html):
-    """Clean HTML content, remove unwanted elements"""
-    soup = BeautifulSoup(html, 'html.parser')
+def parse_date(date_str):
+    """Parse a post date, trying ISO 8601 first, then human formats"""
+    date_str = date_str[:19]
+    try:
+        # Short ISO values keep their offset within 19 chars; drop it so
+        # every date is naive
+        return datetime.fromisoformat(date_str).replace(tzinfo=None)
+    except ValueError:
+        pass
     
-    # Remove unwanted elements
-    unwanted_selectors = [
-        'script', 'style', 'nav', 'footer', 'header',
-        '.subscribe', '.social-share', '.newsletter',
-        '.advertisement', '.ads', '[class*="ad-"]',
-        '[class*="subscribe"]', '[class*="newsletter"]'
-    ]
+    for fmt in DATE_FORMATS:
+        try:
+            return datetime.strptime(date_str, fmt)
+        except ValueError:
+            continue
     
-    for selector in unwanted_selectors:
-        for element in soup.select(selector):
-            element.decompose()
+    return None
+
+def clean_content_inplace(node):
+    """Clean an already parsed content node in place"""
+    # Remove unwanted elements
+    for element in node.select(UNWANTED_CSS):
+        element.decompose()
     
     # Remove empty paragraphs
-    for p in soup.find_all('p'):
+    for p in node.find_all('p'):
         if not p.get_text(strip=True):
             p.decompose()
-    
-    return str(soup)
 
-def extract_images(html, base_url):
-    """Extract image URLs from HTML"""
-    soup = BeautifulSoup(html, 'html.parser')
+def extract_images(node, base_url):
+    """Extract image URLs from an already parsed content node"""
     images = []
     
-    for img in soup.find_all('img'):
+    for img in node.find_all('img'):
         src = img.get('src') or img.get('data-src')
         if src:
             # Convert relative URLs to absolute
@@ -89,23 +200,24 @@ def extract_images(html, base_url):
                 src = urljoin(base_url, src)
             images.append(src)
     
-    return images
+    # Drop duplicates while keeping document order
+    return list(dict.fromkeys(images))
 
 def download_image(img_url, slug):
     """Download image and return local path"""
+    if img_url in _IMG_CACHE:
+        return _IMG_CACHE[img_url]
+    
     try:
-        response = requests.get(img_url, timeout=10, headers={
-            'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
-        })
-        response.raise_for_status()
-        
         # Get file extension
         parsed = urlparse(img_url)
         ext = os.path.splitext(parsed.path)[1] or '.jpg'
         
         # Create images directory for this post
         post_images_dir = IMAGES_DIR / slug
-        post_images_dir.mkdir(parents=True, exist_ok=True)
+        if post_images_dir not in _ENSURED_DIRS:
+            post_images_dir.mkdir(parents=True, exist_ok=True)
+            _ENSURED_DIRS.add(post_images_dir)
         
         # Generate filename
         filename = sanitize_filename(os.path.basename(parsed.path)) or 'image'
@@ -113,93 +225,125 @@ def download_image(img_url, slug):
             filename += ext
         
         local_path = post_images_dir / filename
-        local_path.write_bytes(response.content)
+        part_path = local_path.with_suffix(local_path.suffix + '.part')
+        
+        # Stream the body to a temporary file instead of buffering it in
+        # memory; move it into place only once fully downloaded
+        try:
+            with fetch(img_url, timeout=10, stream=True) as response:
+                response.raise_for_status()
+                response.raw.decode_content = True
+                with open(part_path, 'wb') as f:
+                    shutil.copyfileobj(response.raw, f, length=64 * 1024)
+            part_path.replace(local_path)
+        except Exception:
+            part_path.unlink(missing_ok=True)
+            raise
         
         # Return relative path
-        return f"/blog/{slug}/{filename}"
+        local_url = f"/blog/{slug}/{filename}"
+        _IMG_CACHE[img_url] = local_url
+        return local_url
     except Exception as e:
         print(f"Error downloading image {img_url}: {e}")
         return None
 
+def find_post_elements(soup):
+    """Collect post metadata elements in a single pass over the document"""
+    elems = {}
+    tag_elems = []
+    
+    for el in soup.descendants:
+        name = el.name
+        if name is None:
+            continue  # Text node
+        
+        if name in POST_ELEMENT_NAMES:
+            elems.setdefault(name, el)
+        elif name == 'meta':
+            if el.get('property') == 'og:description':
+                elems.setdefault('og:description', el)
+            elif el.get('name') == 'description':
+                elems.setdefault('description', el)
+        
+        classes = el.get('class')
+        if not classes:
+            continue
+        
+        for key, pattern in POST_CLASS_PATTERNS:
+            if key not in elems and any(pattern.search(c) for c in classes):
+                elems[key] = el
+        if any(_RE_TAG.search(c) for c in classes):
+            tag_elems.append(el)
+    
+    return elems, tag_elems
+
 def scrape_blog_post(url):
     """Scrape a single blog post"""
     try:
         print(f"Scraping: {url}")
-        response = requests.get(url, timeout=30, headers={
-            'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
-        })
+        response = fetch(url, timeout=30)
         response.raise_for_status()
         
-        soup = BeautifulSoup(response.text, 'html.parser')
+        soup = BeautifulSoup(response.content, 'lxml',
+                             from_encoding=declared_encoding(response))
+        
+        elems, tag_elems = find_post_elements(soup)
         
         # Extract title
-        title_elem = soup.find('h1') or soup.find('title')
+        title_elem = elems.get('h1') or elems.get('title')
         title = title_elem.get_text(strip=True) if title_elem else "Untitled"
         
         # Extract date
         date_str = None
-        date_elem = soup.find('time') or soup.find(class_=re.compile(r'date|published'))
+        date_elem = elems.get('time') or elems.get('date')
         if date_elem:
             date_str = date_elem.get('datetime') or date_elem.get_text(strip=True)
         
         # Try to parse date
-        date = None
-        if date_str:
-            try:
-                # Try various date formats
-                for fmt in ['%Y-%m-%d', '%B %d, %Y', '%d %B %Y', '%Y-%m-%dT%H:%M:%S']:
-                    try:
-                        date = datetime.strptime(date_str[:19], fmt)
-                        break
-                    except:
-                        continue
-            except:
-                pass
-        
+        date = parse_date(date_str) if date_str else None
         if not date:
             date = datetime.now()
         
         # Extract author
         author = "Postgres Pro"
-        author_elem = soup.find(class_=re.compile(r'author|byline'))
+        author_elem = elems.get('author')
         if author_elem:
             author = author_elem.get_text(strip=True)
         
         # Extract category
         category = "PostgreSQL"
-        category_elem = soup.find(class_=re.compile(r'category|tag'))
+        category_elem = elems.get('category')
         if category_elem:
             cat_text = category_elem.get_text(strip=True)
-            if cat_text in CATEGORY_MAP:
+            if cat_text in CATEGORY_TR:
                 category = cat_text
         
         # Extract tags
         tags = []
-        tag_elems = soup.find_all(class_=re.compile(r'tag|keyword'))
+        seen_tags = set()
         for tag_elem in tag_elems:
             tag_text = tag_elem.get_text(strip=True)
-            if tag_text and tag_text not in tags:
+            if tag_text and tag_text not in seen_tags:
+                seen_tags.add(tag_text)
                 tags.append(tag_text)
         
         # Extract content
-        content_elem = soup.find('article') or soup.find('main') or soup.find(class_=re.compile(r'content|post-body'))
+        content_elem = elems.get('article') or elems.get('main') or elems.get('content')
         if not content_elem:
-            content_elem = soup.find('body')
+            content_elem = elems.get('body')
         
         if content_elem:
-            # Remove unwanted elements before extracting
-            for unwanted in content_elem.find_all(['script', 'style', 'nav', 'footer']):
-                unwanted.decompose()
-            
-            content_html = str(content_elem)
-            content_html = clean_html_content(content_html)
+            # Clean the content subtree in place and serialize it once
+            clean_content_inplace(content_elem)
+            content_html = content_elem.decode()
             
             # Extract images
-            images = extract_images(content_html, url)
+            images = extract_images(content_elem, url)
             
             # Extract excerpt (first paragraph or meta description)
             excerpt = ""
-            excerpt_elem = soup.find('meta', property='og:description') or soup.find('meta', attrs={'name': 'description'})
+            excerpt_elem = elems.get('og:description') or elems.get('description')
             if excerpt_elem:
                 excerpt = excerpt_elem.get('content', '')
             
@@ -223,7 +367,7 @@ def scrape_blog_post(url):
                 "date": date.isoformat(),
                 "author": author,
                 "category": category,
-                "categoryTr": CATEGORY_MAP.get(category, {}).get("tr", category),
+                "categoryTr": CATEGORY_TR.get(category, category),
                 "tags": tags,
                 "tagsTr": tags,  # Will need translation later
                 "sourceUrl": url,
@@ -256,16 +400,16 @@ def find_all_blog_links(base_url):
         url = f"{base_url}" if page == 1 else f"{base_url}?page={page}"
         try:
             print(f"Fetching blog list page {page}...")
-            response = requests.get(url, timeout=30, headers={
-                'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
-            })
+            response = fetch(url, timeout=30)
             response.raise_for_status()
             
-            soup = BeautifulSoup(response.text, 'html.parser')
+            # Only anchors are needed: post links and the next-page link
+            soup = BeautifulSoup(response.content, 'lxml', parse_only=ONLY_LINKS,
+                                 from_encoding=declared_encoding(response))
             
             # Find all blog post links
             # Common patterns: article > a, .post > a, .blog-post > a, etc.
-            post_links = soup.find_all('a', href=re.compile(r'/blog/'))
+            post_links = soup.find_all('a', href=_RE_BLOG_HREF)
             
             found_new = False
             for link in post_links:
@@ -277,12 +421,11 @@ def find_all_blog_links(base_url):
                         found_new = True
             
             # Check if there's a next page
-            next_link = soup.find('a', class_=re.compile(r'next|pagination'))
+            next_link = soup.find('a', class_=_RE_NEXT)
             if not found_new or not next_link:
                 break
             
             page += 1
-            time.sleep(1)  # Be polite
             
         except Exception as e:
             print(f"Error fetching blog list page {page}: {e}")
@@ -303,23 +446,21 @@ def main():
     blog_urls = find_all_blog_links(BASE_URL)
     print(f"Found {len(blog_urls)} blog posts")
     
-    # Scrape each post
+    # Scrape posts concurrently, saving results as they complete
     scraped_count = 0
-    for url in blog_urls:
-        post = scrape_blog_post(url)
-        
-        if post:
+    with ThreadPoolExecutor(max_workers=MAX_WORKERS) as executor:
+        for post in executor.map(scrape_blog_post, blog_urls):
+            if not post:
+                continue
+            
             # Save as JSON
             slug = post['slug']
             json_path = CONTENT_DIR / f"{slug}.json"
             
-            with open(json_path, 'w', encoding='utf-8') as f:
-                json.dump(post, f, indent=2, ensure_ascii=False)
+            json_path.write_bytes(orjson.dumps(post, option=orjson.OPT_INDENT_2))
             
             scraped_count += 1
             print(f"Saved: {slug}.json")
-        
-        time.sleep(2)  # Be polite to the server
     
     print(f"\nScraping complete! Scraped {scraped_count} posts.")
 